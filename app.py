@@ -6,12 +6,14 @@ import streamlit.components.v1 as components
 import json
 import time
 import requests
-import math
+import numpy as np
 import random
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from utils_selection import ExistingSelection, NewPlaceSelection, get_restaurant_index, build_place_index, resolve_selection, selection_is_stale, selection_name
+
 # --- Utilities ---
 
 def get_secret(key):
@@ -130,14 +132,14 @@ def load_data():
         if os.path.exists(DATA_FILE):
              df = pd.read_csv(DATA_FILE)
              if 'id' not in df.columns: df['id'] = range(1, len(df) + 1)
-             return df
-        return pd.DataFrame(columns=['id', 'Name', 'Cuisine', 'Rating', 'RatingCount', 'Review', 'Latitude', 'Longitude', 'BestMenu', 'Recommender'])
+             return add_distance(df)
+        return add_distance(pd.DataFrame(columns=['id', 'Name', 'Cuisine', 'Rating', 'RatingCount', 'Review', 'Latitude', 'Longitude', 'BestMenu', 'Recommender']))
     
     try:
         response = supabase.table('restaurants').select("*").execute()
         data = response.data
         if not data:
-            return pd.DataFrame(columns=['id', 'Name', 'Cuisine', 'Rating', 'RatingCount', 'Review', 'Latitude', 'Longitude', 'BestMenu', 'Recommender'])
+            return add_distance(pd.DataFrame(columns=['id', 'Name', 'Cuisine', 'Rating', 'RatingCount', 'Review', 'Latitude', 'Longitude', 'BestMenu', 'Recommender']))
         
         df = pd.DataFrame(data)
         # Rename DB columns to App columns
@@ -153,7 +155,7 @@ def load_data():
             'recommender': 'Recommender'
         }
         df = df.rename(columns=rename_map)
-        return df
+        return add_distance(df)
     except Exception as e:
         st.error(f"Error loading from database: {e}")
         return pd.DataFrame()
@@ -174,25 +176,81 @@ if url and key:
 # --- Helper Functions ---
 
 def search_kakao_place(keyword):
+    # Raises on failure so callers can tell an error from "no results" (and errors are never cached)
     if not DEFAULT_REST_API_KEY: return []
     url = "https://dapi.kakao.com/v2/local/search/keyword.json"
     headers = {"Authorization": f"KakaoAK {DEFAULT_REST_API_KEY}"}
     params = {"query": keyword, "x": DEFAULT_LON, "y": DEFAULT_LAT, "radius": 1000, "sort": "accuracy"}
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json().get('documents', [])
-    except Exception:
-        return []
+    response = requests.get(url, headers=headers, params=params, timeout=5)
+    response.raise_for_status()
+    return response.json().get('documents', [])
 
 def calculate_distance(lat1, lon1, lat2, lon2):
+    # Works on scalars as well as whole columns
     R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) * math.sin(dlat / 2) + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) * math.sin(dlon / 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    a = np.sin(dlat / 2) * np.sin(dlat / 2) + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dlon / 2) * np.sin(dlon / 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
     return R * c * 1000
 
+def add_distance(df):
+    # Distance from the office, computed once per data load (load_data is cached); missing coordinates sort last
+    lats = pd.to_numeric(df['Latitude'], errors='coerce')
+    lons = pd.to_numeric(df['Longitude'], errors='coerce')
+    df['Distance'] = calculate_distance(DEFAULT_LAT, DEFAULT_LON, lats, lons).fillna(99999)
+    return df
+
+def format_list_label(row):
+    n = row['Name']; c = row['Cuisine'][:2]; r = f"{row['Rating']:.1f}"
+    m = row['BestMenu'] if pd.notna(row['BestMenu']) else ""
+    if len(n) > 8: n = n[:7] + ".."
+    if len(m) > 10: m = m[:9] + ".."
+    
+    label = f"{n} | {c} | ⭐{r}"
+    if m: label += f" | {m}"
+    return label
+
+# --- Shared Views ---
+# Built once per (data version, filter) and shared by every session via st.cache_resource,
+# so they can be handed to fragments without each session keeping its own copy. Treat as read-only.
+
+@st.cache_resource(ttl=60, max_entries=64)
+def get_list_view(df, category, query):
+    target_df = df
+    if query:
+        target_df = target_df[
+            target_df['Name'].str.contains(query) | 
+            target_df['Cuisine'].str.contains(query) |
+            target_df['BestMenu'].str.contains(query, na=False)
+        ]
+    elif category != "전체":
+        target_df = target_df[target_df['Cuisine'] == category]
+
+    rows = target_df.to_dict('records')
+    return {
+        'sort_orders': {
+            'Rating': target_df.sort_values(by='Rating', ascending=False)['id'].astype(int).tolist(),
+            'Distance': target_df.sort_values(by='Distance', ascending=True)['id'].astype(int).tolist(),
+            'Newest': target_df.sort_values(by='id', ascending=False)['id'].astype(int).tolist(),
+        },
+        'list_labels': {int(r['id']): format_list_label(r) for r in rows},
+        'map_markers': [{"lat": r['Latitude'], "lng": r['Longitude'], "name": r['Name'], "rating": r['Rating']} for r in rows if pd.notna(r['Latitude'])],
+    }
+
+EMPTY_SEARCH_VIEW = {'place_index': {}, 'search_markers': [], 'external_new': []}
+
+@st.cache_resource(ttl=300, max_entries=64)
+def get_search_view(df, keyword):
+    # Raises if the Kakao request fails, so a failure is retried on the next run instead of cached
+    kakao_res = search_kakao_place(keyword)
+    registered_names = set(df['Name'].tolist())
+    return {
+        'place_index': build_place_index(kakao_res),
+        'search_markers': [{"lat": float(p['y']), "lng": float(p['x']), "name": p['place_name']} for p in kakao_res],
+        'external_new': [p for p in kakao_res if p['place_name'] not in registered_names],
+    }
+
 def render_kakao_map(map_id, markers, center_lat, center_lon, selected_name=None, search_markers=None):
     if search_markers is None: search_markers = []
     
@@ -310,80 +368,94 @@ if 'active_category' not in st.session_state: st.session_state.active_category =
 if 'sort_option' not in st.session_state: st.session_state.sort_option = 'Rating'
 if 'search_query' not in st.session_state: st.session_state.search_query = ""
 if 'selection_status' not in st.session_state: st.session_state.selection_status = None
-if 'selected_lat' not in st.session_state: st.session_state.selected_lat = None
-if 'selected_lon' not in st.session_state: st.session_state.selected_lon = None
 if 'winner' not in st.session_state: st.session_state.winner = None
 
 df = load_data()
+restaurant_index = get_restaurant_index(df)
+
+# --- PAGE REGIONS ---
+# The header and the results are st.fragment regions, so a click inside one only re-executes that region.
+# A full app rerun (load_data, filtering, Kakao search) happens when state other regions depend on
+# changes (category, search query, roulette result, saved data).
+#   header   : winner                        -> writes search_query/active_category/selection_status (full rerun)
+#   filters  : active_category, search_query -> plain script code, full rerun on change
+#   results  : sort_option, selection_status -> fragment rerun
+# Streamlit keeps each fragment's arguments in per-session storage for the whole session, so fragments
+# only receive the shared cache_resource objects (restaurant_index, list view, search view) plus a flag,
+# never the per-run DataFrame.
+# The map lives in the results region because it draws the current selection. A selection click therefore
+# re-renders every list button and the map iframe; that cost still grows with the visible list.
 
 # --- HEADER ---
-col_h1, col_h2 = st.columns([3, 1])
-with col_h1:
-    st.markdown(f"<h1 style='margin:0; padding:0; line-height:1.2; font-size: 2.8rem;'>자슐랭</h1>", unsafe_allow_html=True)
-with col_h2:
-    if st.button("🎲 랜덤 맛집\n선택하기", use_container_width=True, type="primary"):
-        if not df.empty:
-            # 1. Clear Search State FIRST
-            st.session_state.search_query = ""
-            st.session_state.winner = None # Reset winner on new roll
-            
-            # 2. Roulette Animation (Enhanced Tension & Slow Finish)
-            placeholder = st.empty()
-            names = df['Name'].tolist()
-            
-            # Phase 1: Fast (First 10)
-            for i in range(10):
-                placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🎲 {random.choice(names)}</div>", unsafe_allow_html=True)
-                time.sleep(0.05)
-            
-            # Phase 2: Decelerating (Next 10)
-            for i in range(10):
-                delay = 0.05 + (i * 0.05) # 이 숫자를 키우면 점점 더 느려집니다.
-                placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🎲 {random.choice(names)}</div>", unsafe_allow_html=True)
-                time.sleep(delay)
-            
-            # Phase 3: Final Tension (Final 3)
-            for i in range(3):
-                delay = 0.6 + (i * 0.1) # 0.4를 더 크게 하면 마지막이 아주 천천히 바뀝니다.
-                placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🕒 {random.choice(names)}...</div>", unsafe_allow_html=True)
-                time.sleep(delay)
-            
-            # 3. Final Selection
-            winner = df.sample(1).iloc[0]
-            st.session_state.winner = winner['Name']
-            st.session_state.active_category = winner['Cuisine']
-            st.session_state.selection_status = {'type': 'existing', 'data': winner}
-            st.session_state.selected_lat = winner['Latitude']
-            st.session_state.selected_lon = winner['Longitude']
-            st.balloons()
-            st.rerun()
-            
-# --- ROULETTE / WINNER AREA ---
-# This area is placed directly below the header to ensure consistent positioning
-winner_container = st.empty()
-
-if st.session_state.winner:
-    with winner_container:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #6a11cb 0%, #2575fc 100%);
-            padding: 12px 20px;
-            border-radius: 12px;
-            text-align: center;
-            box-shadow: 0 4px 15px rgba(37, 117, 252, 0.3);
-            margin: 10px 0;
-            animation: winnerPop 0.5s cubic-bezier(0.175, 0.885, 0.32, 1.275) forwards;
-        ">
-            <span style="color: white; font-size: 13px; font-weight: 300; opacity: 0.8;">� 오늘의 정석 추천</span>
-            <div style="color: white; margin-top: 4px; font-size: 26px; font-weight: 800; text-shadow: 1px 1px 5px rgba(0,0,0,0.2);">{st.session_state.winner}</div>
-        </div>
-        <style>
-        @keyframes winnerPop {{
-            0% {{ transform: scale(0.85); opacity: 0; }}
-            100% {{ transform: scale(1); opacity: 1; }}
-        }}
-        </style>
-        """, unsafe_allow_html=True)
+@st.fragment
+def render_header(restaurant_index):
+    col_h1, col_h2 = st.columns([3, 1])
+    with col_h1:
+        st.markdown(f"<h1 style='margin:0; padding:0; line-height:1.2; font-size: 2.8rem;'>자슐랭</h1>", unsafe_allow_html=True)
+    with col_h2:
+        if st.button("🎲 랜덤 맛집\n선택하기", use_container_width=True, type="primary"):
+            if restaurant_index:
+                # 1. Clear Search State FIRST
+                st.session_state.search_query = ""
+                st.session_state.winner = None # Reset winner on new roll
+                
+                # 2. Roulette Animation (Enhanced Tension & Slow Finish)
+                placeholder = st.empty()
+                names = [r['Name'] for r in restaurant_index.values()]
+                
+                # Phase 1: Fast (First 10)
+                for i in range(10):
+                    placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🎲 {random.choice(names)}</div>", unsafe_allow_html=True)
+                    time.sleep(0.05)
+                
+                # Phase 2: Decelerating (Next 10)
+                for i in range(10):
+                    delay = 0.05 + (i * 0.05) # 이 숫자를 키우면 점점 더 느려집니다.
+                    placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🎲 {random.choice(names)}</div>", unsafe_allow_html=True)
+                    time.sleep(delay)
+                
+                # Phase 3: Final Tension (Final 3)
+                for i in range(3):
+                    delay = 0.6 + (i * 0.1) # 0.4를 더 크게 하면 마지막이 아주 천천히 바뀝니다.
+                    placeholder.markdown(f"<div style='text-align:center; font-size:24px; font-weight:bold; color:#ff4b4b; background:#fff2f2; padding:10px; border-radius:10px; border:2px solid #ff4b4b;'>🕒 {random.choice(names)}...</div>", unsafe_allow_html=True)
+                    time.sleep(delay)
+                
+                # 3. Final Selection
+                winner = random.choice(list(restaurant_index.values()))
+                st.session_state.winner = winner['Name']
+                st.session_state.active_category = winner['Cuisine']
+                st.session_state.selection_status = ExistingSelection(int(winner['id']))
+                st.balloons()
+                st.rerun() # Full rerun: category and selection affect every region
+                
+    # --- ROULETTE / WINNER AREA ---
+    # This area is placed directly below the header to ensure consistent positioning
+    winner_container = st.empty()
+    
+    if st.session_state.winner:
+        with winner_container:
+            st.markdown(f"""
+            <div style="
+                background: linear-gradient(135deg, #6a11cb 0%, #2575fc 100%);
+                padding: 12px 20px;
+                border-radius: 12px;
+                text-align: center;
+                box-shadow: 0 4px 15px rgba(37, 117, 252, 0.3);
+                margin: 10px 0;
+                animation: winnerPop 0.5s cubic-bezier(0.175, 0.885, 0.32, 1.275) forwards;
+            ">
+                <span style="color: white; font-size: 13px; font-weight: 300; opacity: 0.8;">� 오늘의 정석 추천</span>
+                <div style="color: white; margin-top: 4px; font-size: 26px; font-weight: 800; text-shadow: 1px 1px 5px rgba(0,0,0,0.2);">{st.session_state.winner}</div>
+            </div>
+            <style>
+            @keyframes winnerPop {{
+                0% {{ transform: scale(0.85); opacity: 0; }}
+                100% {{ transform: scale(1); opacity: 1; }}
+            }}
+            </style>
+            """, unsafe_allow_html=True)
+
+render_header(restaurant_index)
 
 # --- DATA PREPARATION ---
 categories = ["전체", "한식", "중식", "일식", "양식", "분식", "술집", "기타"]
@@ -403,135 +475,106 @@ if search_input != st.session_state.search_query:
         st.session_state.active_category = "전체" # Switch to show all if searching
     st.rerun()
 
-# Filtering Logic
-target_df = df.copy()
-if st.session_state.search_query:
-    target_df = target_df[
-        target_df['Name'].str.contains(st.session_state.search_query) | 
-        target_df['Cuisine'].str.contains(st.session_state.search_query) |
-        target_df['BestMenu'].str.contains(st.session_state.search_query, na=False)
-    ]
-elif st.session_state.active_category != "전체":
-    target_df = target_df[target_df['Cuisine'] == st.session_state.active_category]
-
-# Sort Logic
-if st.session_state.sort_option == 'Rating': 
-    target_df = target_df.sort_values(by='Rating', ascending=False)
-elif st.session_state.sort_option == 'Newest': 
-    target_df = target_df.sort_values(by='id', ascending=False)
-elif st.session_state.sort_option == 'Distance':
-    def _calc(r):
-        if pd.isna(r['Latitude']): return 99999
-        return calculate_distance(DEFAULT_LAT, DEFAULT_LON, r['Latitude'], r['Longitude'])
-    target_df['Distance'] = target_df.apply(_calc, axis=1)
-    target_df = target_df.sort_values(by='Distance', ascending=True)
-
-# Selection State Prep
-s_status = st.session_state.selection_status
-selected_name = None
-if s_status:
-    if s_status.get('type') == 'existing':
-        selected_name = s_status['data']['Name']
-    elif s_status.get('type') == 'new':
-        selected_name = s_status['data']['place_name']
-
-# --- DATA PREP FOR MAP & EXTERNAL ---
-map_markers = []
-for _, row in target_df.iterrows():
-    if pd.notna(row['Latitude']):
-        map_markers.append({"lat": row['Latitude'], "lng": row['Longitude'], "name": row['Name'], "rating": row['Rating']})
-if selected_name and s_status and s_status.get('type') == 'existing':
-    map_markers = [m for m in map_markers if m['name'] == selected_name]
-
-kakao_res = []
+# --- DATA PREP FOR LIST, MAP & EXTERNAL ---
+list_view = get_list_view(df, st.session_state.active_category, st.session_state.search_query)
+
+search_view = EMPTY_SEARCH_VIEW
+kakao_failed = False
 if st.session_state.search_query:
-    try: kakao_res = search_kakao_place(st.session_state.search_query)
-    except: pass
-search_markers = []
-registered_names = set(df['Name'].tolist())
-external_new = []
-for p in kakao_res:
-    search_markers.append({"lat": float(p['y']), "lng": float(p['x']), "name": p['place_name']})
-    if p['place_name'] not in registered_names: external_new.append(p)
-
-# --- RECENT SEARCH LIST (If searching) ---
-if st.session_state.search_query and external_new:
-    st.caption(f"➕ 미등록 장소 바로 등록하기")
+    try: search_view = get_search_view(df, st.session_state.search_query)
+    except Exception: kakao_failed = True
+
+# --- LIST / DETAIL / MAP ---
+# Sort/selection buttons update state in on_click, which runs before the fragment rerun the click
+# triggers, so one click costs a single fragment run instead of a run plus st.rerun().
+def _set_state(key, value):
+    st.session_state[key] = value
+
+@st.fragment
+def render_results(list_view, search_view, restaurant_index, kakao_failed):
+    sort_orders, list_labels, map_markers = list_view['sort_orders'], list_view['list_labels'], list_view['map_markers']
+    place_index, search_markers, external_new = search_view['place_index'], search_view['search_markers'], search_view['external_new']
+
+    # Selection State Prep (session only holds ids; details come from the shared indexes)
+    s_status = st.session_state.selection_status
+    selected_record = resolve_selection(s_status, restaurant_index, place_index)
+    if selection_is_stale(s_status, selected_record, kakao_failed):
+        # Selected place disappeared after a data reload or a new search
+        st.session_state.selection_status = s_status = None
+    selected_name = selection_name(s_status, selected_record)
+    selected_id = s_status.restaurant_id if isinstance(s_status, ExistingSelection) else None
+    selected_place_id = s_status.place_id if isinstance(s_status, NewPlaceSelection) else None
+
+    if selected_id is not None:
+        map_markers = []
+        if pd.notna(selected_record['Latitude']):
+            map_markers.append({"lat": selected_record['Latitude'], "lng": selected_record['Longitude'], "name": selected_record['Name'], "rating": selected_record['Rating']})
+
+    # --- RECENT SEARCH LIST (If searching) ---
+    if st.session_state.search_query and external_new:
+        st.caption(f"➕ 미등록 장소 바로 등록하기")
+        # Remove fixed height for full page scroll
+        for i, p in enumerate(external_new):
+            n = p['place_name']
+            if len(n) > 15: n = n[:14] + ".."
+            addr = p['address_name']
+            if len(addr) > 20: addr = addr[:19] + ".."
+            
+            is_sel = (selected_place_id == str(p['id']))
+            st.button(f"➕ {n} | {addr}", key=f"new_btn_{i}", use_container_width=True, type="primary" if is_sel else "secondary",
+                      on_click=_set_state, args=('selection_status', None if is_sel else NewPlaceSelection(str(p['id']))))
+                
+            # Accordion Detail (New Place)
+            if is_sel:
+                with st.container(border=True):
+                    st.caption("🆕 새로운 맛집 등록")
+                    with st.form(f"reg_form_{i}"):
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            new_cuisine = st.selectbox("카테고리", ["한식", "중식", "일식", "양식", "분식", "술집", "기타"], index=(["한식", "중식", "일식", "양식", "분식", "술집", "기타"].index(st.session_state.active_category) if st.session_state.active_category in ["한식", "중식", "일식", "양식", "분식", "술집", "기타"] else 0))
+                            new_rating = st.slider("평점", 0.0, 5.0, 4.0, 0.5)
+                        with col2:
+                            new_menu = st.text_input("대표 메뉴", placeholder="추천 메뉴")
+                            new_recommender = st.text_input("추천인", value="익명")
+                        new_review = st.text_area("한줄평", placeholder="미각을 사로잡은 포인트는?")
+                        if st.form_submit_button("맛집 등록하기", type="primary", use_container_width=True):
+                            if not new_menu: st.warning("대표 메뉴는 필수입니다!")
+                            else:
+                                f_review = new_review if new_review.strip() else "리뷰가 아직 없어요."
+                                if save_data({'Name': p['place_name'], 'Cuisine': new_cuisine, 'Rating': new_rating, 'RatingCount': 1, 'Review': f_review, 'Latitude': float(p['y']), 'Longitude': float(p['x']), 'BestMenu': new_menu, 'Recommender': new_recommender}, is_new=True):
+                                    st.success("성공적으로 등록되었습니다!"); time.sleep(1); st.session_state.selection_status = None; st.rerun() # Full rerun to reload data
+
+    # --- LIST VIEW (Moved up for Mobile) ---
+    st.caption(f"📋 맛집 리스트 ({len(list_labels)}곳)")
+    with st.expander("🌪️ 정렬 옵션", expanded=False):
+        c1, c2, c3 = st.columns(3)
+        c1.button("⭐ 평점순", use_container_width=True, type="primary" if st.session_state.sort_option=='Rating' else "secondary", on_click=_set_state, args=('sort_option', 'Rating'))
+        c2.button("📏 거리순", use_container_width=True, type="primary" if st.session_state.sort_option=='Distance' else "secondary", on_click=_set_state, args=('sort_option', 'Distance'))
+        c3.button("🆕 최신순", use_container_width=True, type="primary" if st.session_state.sort_option=='Newest' else "secondary", on_click=_set_state, args=('sort_option', 'Newest'))
+
     # Remove fixed height for full page scroll
-    for i, p in enumerate(external_new):
-        n = p['place_name']
-        if len(n) > 15: n = n[:14] + ".."
-        addr = p['address_name']
-        if len(addr) > 20: addr = addr[:19] + ".."
-        
-        is_sel = (selected_name == p['place_name'])
-        if st.button(f"➕ {n} | {addr}", key=f"new_btn_{i}", use_container_width=True, type="primary" if is_sel else "secondary"):
-            if is_sel and s_status['type'] == 'new':
-                st.session_state.selection_status = None
-            else:
-                st.session_state.selection_status = {'type': 'new', 'data': p}
-            st.rerun()
+    for rid in sort_orders.get(st.session_state.sort_option, sort_orders['Rating']):
+        row = restaurant_index[rid]
+        is_sel = (selected_id == rid)
+        st.button(list_labels[rid], key=f"list_{rid}", type="primary" if is_sel else "secondary", use_container_width=True,
+                  on_click=_set_state, args=('selection_status', None if is_sel else ExistingSelection(rid)))
             
-        # Accordion Detail (New Place)
-        if is_sel and s_status['type'] == 'new':
+        # Accordion Detail (Existing Place)
+        if is_sel:
             with st.container(border=True):
-                st.caption("🆕 새로운 맛집 등록")
-                with st.form(f"reg_form_{i}"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        new_cuisine = st.selectbox("카테고리", ["한식", "중식", "일식", "양식", "분식", "술집", "기타"], index=(["한식", "중식", "일식", "양식", "분식", "술집", "기타"].index(st.session_state.active_category) if st.session_state.active_category in ["한식", "중식", "일식", "양식", "분식", "술집", "기타"] else 0))
-                        new_rating = st.slider("평점", 0.0, 5.0, 4.0, 0.5)
-                    with col2:
-                        new_menu = st.text_input("대표 메뉴", placeholder="추천 메뉴")
-                        new_recommender = st.text_input("추천인", value="익명")
-                    new_review = st.text_area("한줄평", placeholder="미각을 사로잡은 포인트는?")
-                    if st.form_submit_button("맛집 등록하기", type="primary", use_container_width=True):
-                        if not new_menu: st.warning("대표 메뉴는 필수입니다!")
-                        else:
-                            f_review = new_review if new_review.strip() else "리뷰가 아직 없어요."
-                            if save_data({'Name': p['place_name'], 'Cuisine': new_cuisine, 'Rating': new_rating, 'RatingCount': 1, 'Review': f_review, 'Latitude': float(p['y']), 'Longitude': float(p['x']), 'BestMenu': new_menu, 'Recommender': new_recommender}, is_new=True):
-                                st.success("성공적으로 등록되었습니다!"); time.sleep(1); st.session_state.selection_status = None; st.rerun()
-
-# --- LIST VIEW (Moved up for Mobile) ---
-st.caption(f"📋 맛집 리스트 ({len(target_df)}곳)")
-with st.expander("🌪️ 정렬 옵션", expanded=False):
-    c1, c2, c3 = st.columns(3)
-    if c1.button("⭐ 평점순", use_container_width=True, type="primary" if st.session_state.sort_option=='Rating' else "secondary"): st.session_state.sort_option='Rating'; st.rerun()
-    if c2.button("📏 거리순", use_container_width=True, type="primary" if st.session_state.sort_option=='Distance' else "secondary"): st.session_state.sort_option='Distance'; st.rerun()
-    if c3.button("🆕 최신순", use_container_width=True, type="primary" if st.session_state.sort_option=='Newest' else "secondary"): st.session_state.sort_option='Newest'; st.rerun()
-
-# Remove fixed height for full page scroll
-for _, row in target_df.iterrows():
-    n = row['Name']; c = row['Cuisine'][:2]; r = f"{row['Rating']:.1f}"
-    m = row['BestMenu'] if pd.notna(row['BestMenu']) else ""
-    if len(n) > 8: n = n[:7] + ".."
-    if len(m) > 10: m = m[:9] + ".."
-    
-    label = f"{n} | {c} | ⭐{r}"
-    if m: label += f" | {m}"
-    
-    is_sel = (selected_name == row['Name'])
-    if st.button(label, key=f"list_{row['id']}", type="primary" if is_sel else "secondary", use_container_width=True):
-        if is_sel and s_status['type'] == 'existing':
-            st.session_state.selection_status = None
-        else:
-            st.session_state.selection_status = {'type': 'existing', 'data': row}
-        st.rerun()
-        
-    # Accordion Detail (Existing Place)
-    if is_sel and s_status['type'] == 'existing':
-        with st.container(border=True):
-            st.subheader(f"🍽️ {row['Name']}")
-            st.caption(f"⭐ {row['Rating']:.1f} | {row['BestMenu']}")
-            st.markdown(f"> {row['Review']}")
-
-if target_df.empty and not external_new:
-    st.info("해당 조건의 맛집이 없습니다.")
-    if st.session_state.search_query:
-        if st.button("검색 초기화"): st.session_state.search_query=""; st.rerun()
-
-# --- MAP VIEW (Moved down) ---
-render_kakao_map("main_map", map_markers, DEFAULT_LAT, DEFAULT_LON, selected_name, search_markers)
+                st.subheader(f"🍽️ {row['Name']}")
+                st.caption(f"⭐ {row['Rating']:.1f} | {row['BestMenu']}")
+                st.markdown(f"> {row['Review']}")
+
+    if not list_labels and not external_new:
+        st.info("해당 조건의 맛집이 없습니다.")
+        if st.session_state.search_query:
+            if st.button("검색 초기화"): st.session_state.search_query=""; st.rerun()
+
+    # --- MAP VIEW (Moved down) ---
+    render_kakao_map("main_map", map_markers, DEFAULT_LAT, DEFAULT_LON, selected_name, search_markers)
+
+render_results(list_view, search_view, restaurant_index, kakao_failed)
 
 
 
@@ -0,0 +1,92 @@
+
+# Per-session memory kept for the restaurant selection.
+# Measures with tracemalloc what one session keeps alive between runs:
+#   old layout: selection_status = {'type': 'existing', 'data': <row Series from that run's DataFrame copy>}
+#   new layout: selection_status = ExistingSelection(id), plus the fragment arguments, which only
+#               reference objects shared by all sessions (st.cache_resource)
+# The shared objects are measured once, since they do not grow with the number of sessions.
+# The pickled size is listed too; Streamlit only pays it with runner.enforceSerializableSessionState.
+#
+#   python benchmarks/session_state_size.py [sessions] [rows]
+
+import os
+import sys
+import pickle
+import tracemalloc
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils_selection import ExistingSelection, NewPlaceSelection
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'restaurants.csv')
+
+# Shape of a Kakao keyword search document
+KAKAO_DOC = {
+    'id': '26338954', 'place_name': '충무로닭갈비', 'category_name': '음식점 > 한식 > 닭요리',
+    'category_group_code': 'FD6', 'category_group_name': '음식점', 'phone': '02-2265-0000',
+    'address_name': '서울 중구 충무로3가 25-12', 'road_address_name': '서울 중구 퇴계로 000',
+    'x': '126.991', 'y': '37.5617', 'place_url': 'http://place.map.kakao.com/26338954', 'distance': '120',
+}
+
+def load(rows):
+    df = pd.read_csv(DATA_FILE)
+    if rows > len(df):
+        df = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).head(rows)
+    df['id'] = range(1, len(df) + 1)
+    return df
+
+def traced(build, sessions):
+    # Average bytes each session keeps after build() returns
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(sessions)]
+    held = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del kept
+    return held / sessions
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    df = load(rows)
+    print(f"{len(df)} rows, {sessions} sessions")
+
+    def old_session(i):
+        # st.cache_data hands every run its own copy; the selected row Series outlives the run
+        run_df = pickle.loads(pickle.dumps(df))
+        row = run_df.iloc[i % len(run_df)]
+        return {'selection_status': {'type': 'existing', 'data': row}}
+
+    # Warm up pandas/pickle so one-time allocations are not counted
+    old_session(0); df.to_dict('records')
+
+    # Shared once per data version (st.cache_resource), not per session
+    tracemalloc.start()
+    restaurant_index = {int(r['id']): r for r in df.to_dict('records')}
+    shared = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_view, search_view = {}, {}
+
+    def new_session(i):
+        return {
+            'selection_status': ExistingSelection(i % len(df) + 1),
+            'fragment_args': [(restaurant_index,), (list_view, search_view, restaurant_index, False)],
+        }
+
+    old = traced(old_session, sessions)
+    new = traced(new_session, sessions)
+    row = df.iloc[0]
+    print("existing restaurant (tracemalloc, bytes kept per session)")
+    print(f"  old: {old:>9.0f} B  (row Series memory_usage(deep=True): {row.memory_usage(deep=True)} B)")
+    print(f"  new: {new:>9.0f} B  (+ {shared / 1024:.1f} KiB restaurant_index shared by all sessions)")
+    print(f"  {sessions} sessions: {old * sessions / 1024:.1f} KiB -> {new * sessions / 1024:.1f} KiB")
+
+    print("pickled size (only with runner.enforceSerializableSessionState)")
+    for label, old_value, new_value in [
+        ("existing restaurant", {'type': 'existing', 'data': row}, ExistingSelection(1)),
+        ("new Kakao place", {'type': 'new', 'data': KAKAO_DOC}, NewPlaceSelection(KAKAO_DOC['id'])),
+    ]:
+        print(f"  {label}: {len(pickle.dumps(old_value))} B -> {len(pickle.dumps(new_value))} B")
+
+if __name__ == '__main__':
+    main()
@@ -6,8 +6,11 @@ import streamlit.components.v1 as components
 import json
 import time
 
+from utils_selection import ExistingSelection, NewPlaceSelection, resolve_selection, selection_is_stale
+
 # Helper function to render the dashboard content (List + Map)
-def render_dashboard(filtered_df, search_markers=None):
+# restaurant_index / place_index must be built from the full data and the Kakao results (see app.py)
+def render_dashboard(filtered_df, restaurant_index, place_index, search_markers=None, search_failed=False):
     if search_markers is None:
         search_markers = []
         
@@ -17,14 +20,18 @@ def render_dashboard(filtered_df, search_markers=None):
     
     # --- 2. Dashboard Interface (List & Detail) ---
     status = st.session_state.selection_status
+    selected = resolve_selection(status, restaurant_index, place_index)
+    if selection_is_stale(status, selected, search_failed):
+        st.session_state.selection_status = status = None
+    selected_id = status.restaurant_id if isinstance(status, ExistingSelection) else None
     
     # Container for the dashboard list
     dashboard_container = st.container()
     
     with dashboard_container:
         # A. Selected Item Detail View
-        if status and status.get('type') == 'existing':
-            row = status['data']
+        if isinstance(status, ExistingSelection):
+            row = selected
             with st.container(border=True): # Card Style
                 d_col1, d_col2 = st.columns([9, 1])
                 with d_col1:
@@ -33,9 +40,6 @@ def render_dashboard(filtered_df, search_markers=None):
                 with d_col2:
                     if st.button("❌", key="close_dash"):
                          st.session_state.selection_status = None
-                         st.session_state.selected_lat = None
-                         st.session_state.selected_lon = None
-                         st.session_state.selected_name = None
                          st.rerun()
 
                 st.markdown(f"**👍 맛있었던 메뉴**: {row['BestMenu']}")
@@ -50,11 +54,11 @@ def render_dashboard(filtered_df, search_markers=None):
                     # I will include a placeholder or full form if needed.
                     pass
 
-        elif status and status.get('type') == 'new':
+        elif isinstance(status, NewPlaceSelection) and selected is not None:
             # New Place Registration view
-            item = status['data']
+            item = selected
             with st.container(border=True):
-                st.subheader(f"📍 {item['name']}")
+                st.subheader(f"📍 {item['place_name']}")
                 if st.button("❌", key="close_new"):
                      st.session_state.selection_status = None
                      st.rerun()
@@ -76,14 +80,11 @@ def render_dashboard(filtered_df, search_markers=None):
                     rating_val = f"{row['Rating']:.1f}"
                     label = f"{name_val:<10} {cuisine_val:<5} ⭐{rating_val:<4}    {menu_val}"
                     
-                    is_selected = (status and status.get('data', {}).get('Name') == row['Name'])
+                    is_selected = (selected_id == int(row['id']))
                     btn_type = "primary" if is_selected else "secondary"
                     
                     if st.button(label, key=f"list_btn_{idx}", type=btn_type, use_container_width=True):
-                         st.session_state.selection_status = {'type': 'existing', 'data': row}
-                         st.session_state.selected_lat = row['Latitude']
-                         st.session_state.selected_lon = row['Longitude']
-                         st.session_state.selected_name = row['Name']
+                         st.session_state.selection_status = ExistingSelection(int(row['id']))
                          st.rerun()
         else:
             st.info("조건에 맞는 맛집이 없습니다.")
@@ -106,15 +107,15 @@ def render_dashboard(filtered_df, search_markers=None):
             
     # Selected Marker
     selected_marker = None
-    if st.session_state.selected_lat:
+    if selected_id is not None and pd.notna(selected['Latitude']):
         selected_marker = {
-            "lat": st.session_state.selected_lat,
-            "lng": st.session_state.selected_lon,
-            "name": st.session_state.selected_name or "선택된 위치"
+            "lat": selected['Latitude'],
+            "lng": selected['Longitude'],
+            "name": selected['Name'] or "선택된 위치"
         }
 
-    center_lat = st.session_state.selected_lat if st.session_state.selected_lat else (filtered_df['Latitude'].mean() if not filtered_df.empty else DEFAULT_LAT)
-    center_lon = st.session_state.selected_lon if st.session_state.selected_lon else (filtered_df['Longitude'].mean() if not filtered_df.empty else DEFAULT_LON)
+    center_lat = selected_marker['lat'] if selected_marker else (filtered_df['Latitude'].mean() if not filtered_df.empty else DEFAULT_LAT)
+    center_lon = selected_marker['lng'] if selected_marker else (filtered_df['Longitude'].mean() if not filtered_df.empty else DEFAULT_LON)
 
     # Simplified JS for performance in this view
     kakao_map_html = f"""
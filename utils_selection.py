@@ -0,0 +1,48 @@
+
+import streamlit as st
+import pandas as pd
+from dataclasses import dataclass
+
+# Selection records kept in st.session_state.selection_status.
+# Only ids are stored per session; details are looked up from the shared index
+# on every run so the selection never holds a stale copy of the data.
+
+@dataclass(frozen=True)
+class ExistingSelection:
+    restaurant_id: int
+
+@dataclass(frozen=True)
+class NewPlaceSelection:
+    place_id: str
+
+@st.cache_resource(ttl=60, max_entries=8)
+def get_restaurant_index(df):
+    # Shared across sessions (not copied per call like st.cache_data) - treat as read-only.
+    # load_data always provides an id column for non-empty frames
+    if df.empty:
+        return {}
+    return {int(r['id']): r for r in df.to_dict('records') if pd.notna(r['id'])}
+
+def build_place_index(kakao_res):
+    return {str(p['id']): p for p in kakao_res if p.get('id')}
+
+def resolve_selection(selection, restaurant_index, place_index=None):
+    # Returns the detail record for the selection, or None if it no longer exists.
+    if isinstance(selection, ExistingSelection):
+        return restaurant_index.get(selection.restaurant_id)
+    if isinstance(selection, NewPlaceSelection):
+        return (place_index or {}).get(selection.place_id)
+    return None
+
+def selection_is_stale(selection, record, search_failed=False):
+    # A failed Kakao search says nothing about whether a new place still exists, so keep it
+    if not selection or record is not None:
+        return False
+    return not (isinstance(selection, NewPlaceSelection) and search_failed)
+
+def selection_name(selection, record):
+    if record is None:
+        return None
+    if isinstance(selection, ExistingSelection):
+        return record['Name']
+    return record['place_name']